@@ -17,10 +17,12 @@ import argparse
 from tensorflow_asr.utils import setup_environment
 
 setup_environment()
+import numpy as np
 import tensorflow as tf
 
 from tensorflow_asr.configs.config import Config
-from tensorflow_asr.featurizers.speech_featurizers import TFSpeechFeaturizer
+from tensorflow_asr.datasets.asr_dataset import ASRSliceDataset
+from tensorflow_asr.featurizers.speech_featurizers import TFSpeechFeaturizer, read_raw_audio
 from tensorflow_asr.featurizers.text_featurizers import CharFeaturizer
 from tensorflow_asr.models.streaming_transducer import StreamingTransducer
 
@@ -36,12 +38,25 @@ parser.add_argument("--config", type=str, default=DEFAULT_YAML,
 parser.add_argument("--saved", type=str, default=None,
                     help="Path to saved model")
 
+parser.add_argument("--quantize", default=False, action="store_true",
+                    help="Quantize activations to int8 using a representative dataset")
+
+parser.add_argument("--representative", nargs="*", type=str, default=[],
+                    help="Transcript files whose audio are used for calibrating quantization")
+
+parser.add_argument("--num_calibration", type=int, default=100,
+                    help="Number of audio files used for calibrating quantization")
+
+parser.add_argument("--chunk_size", type=int, default=4096,
+                    help="Number of samples per streaming chunk when calibrating quantization")
+
 parser.add_argument("output", type=str, default=None,
                     help="TFLite file path to be exported")
 
 args = parser.parse_args()
 
 assert args.saved and args.output
+assert not args.quantize or args.representative, "--representative is required for --quantize"
 
 config = Config(args.config, learning=True)
 speech_featurizer = TFSpeechFeaturizer(config.speech_config)
@@ -60,8 +75,36 @@ streaming_transducer.add_featurizers(speech_featurizer, text_featurizer)
 concrete_func = streaming_transducer.make_tflite_function(greedy=True).get_concrete_function()
 converter = tf.lite.TFLiteConverter.from_concrete_functions([concrete_func])
 converter.optimizations = [tf.lite.Optimize.DEFAULT]
+converter.experimental_enable_resource_variables = True
 converter.target_spec.supported_ops = [tf.lite.OpsSet.TFLITE_BUILTINS,
                                        tf.lite.OpsSet.SELECT_TF_OPS]
+
+if args.quantize:
+    entries = ASRSliceDataset(
+        stage="calibration", speech_featurizer=speech_featurizer, text_featurizer=text_featurizer,
+        data_paths=args.representative, shuffle=False
+    ).read_entries()
+
+    def representative_dataset():
+        # Calibrate the way the model streams: chunk the signals and feed back the returned
+        # prediction and states, so that states are calibrated with their real ranges
+        for audio_file, *_ in entries[:args.num_calibration]:
+            signal = np.asarray(read_raw_audio(audio_file, speech_featurizer.sample_rate), dtype=np.float32)
+            predicted = np.asarray(text_featurizer.blank, dtype=np.int32)
+            encoder_states = streaming_transducer.encoder.get_initial_state().numpy()
+            prediction_states = streaming_transducer.predict_net.get_initial_state().numpy()
+            for start in range(0, signal.shape[0], args.chunk_size):
+                chunk = signal[start:start + args.chunk_size]
+                if chunk.shape[0] < args.chunk_size:
+                    chunk = np.pad(chunk, [[0, args.chunk_size - chunk.shape[0]]])
+                yield [chunk, predicted, encoder_states, prediction_states]
+                _, predicted, encoder_states, prediction_states = [
+                    x.numpy() for x in concrete_func(chunk, predicted, encoder_states, prediction_states)
+                ]
+
+    # Ops without int8 kernels (feature extraction, text ops) fall back to float
+    converter.representative_dataset = representative_dataset
+
 tflite_model = converter.convert()
 
 if not os.path.exists(os.path.dirname(args.output)):
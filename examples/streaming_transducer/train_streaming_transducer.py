@@ -13,6 +13,7 @@
 # limitations under the License.
 
 import os
+import copy
 import argparse
 from tensorflow_asr.utils import setup_environment, setup_strategy
 
@@ -34,6 +35,9 @@ parser.add_argument("--max_ckpts", type=int, default=10,
 parser.add_argument("--tfrecords", default=False, action="store_true",
                     help="Whether to use tfrecords")
 
+parser.add_argument("--precomputed_features", default=False, action="store_true",
+                    help="Whether to use tfrecords of precomputed features (see scripts/create_tfrecords.py)")
+
 parser.add_argument("--tbs", type=int, default=None,
                     help="Train batch size per replica")
 
@@ -43,18 +47,35 @@ parser.add_argument("--ebs", type=int, default=None,
 parser.add_argument("--devices", type=int, nargs="*", default=[0],
                     help="Devices' ids to apply distributed training")
 
+parser.add_argument("--scale_lr", default=False, action="store_true",
+                    help="Scale learning rate linearly with the number of replicas")
+
 parser.add_argument("--mxp", default=False, action="store_true",
                     help="Enable mixed precision")
 
 parser.add_argument("--cache", default=False, action="store_true",
                     help="Enable caching for dataset")
 
+parser.add_argument("--snapshot_dir", type=str, default=None,
+                    help="Directory to snapshot featurized dataset to disk (augmentations are frozen, like --cache), "
+                         "requires --tfrecords")
+
+parser.add_argument("--buckets", type=float, nargs="*", default=[],
+                    help="Bucket boundaries of training audio durations in seconds, e.g. 2 4 6 8 10 12 14 16")
+
 args = parser.parse_args()
 
-tf.config.optimizer.set_experimental_options({"auto_mixed_precision": args.mxp})
+if args.snapshot_dir and not args.tfrecords:
+    parser.error("--snapshot_dir requires --tfrecords")
 
+# Use keras mixed precision policy instead of the grappler rewrite enabled in setup_environment
+tf.config.optimizer.set_experimental_options({"auto_mixed_precision": False})
 strategy = setup_strategy(args.devices)
 
+from tensorflow_asr.utils.utils import set_mixed_precision_policy, get_loss_scale_optimizer
+
+if args.mxp: set_mixed_precision_policy("mixed_float16")
+
 from tensorflow_asr.configs.config import Config
 from tensorflow_asr.datasets.asr_dataset import ASRTFRecordDataset, ASRSliceDataset
 from tensorflow_asr.featurizers.speech_featurizers import TFSpeechFeaturizer
@@ -73,14 +94,18 @@ if args.tfrecords:
         speech_featurizer=speech_featurizer,
         text_featurizer=text_featurizer,
         augmentations=config.learning_config.augmentations,
-        stage="train", cache=args.cache, shuffle=True
+        stage="train", cache=args.cache, shuffle=True, buckets=args.buckets,
+        snapshot_dir=args.snapshot_dir,
+        precomputed_features=args.precomputed_features
     )
     eval_dataset = ASRTFRecordDataset(
         data_paths=config.learning_config.dataset_config.eval_paths,
         tfrecords_dir=config.learning_config.dataset_config.tfrecords_dir,
         speech_featurizer=speech_featurizer,
         text_featurizer=text_featurizer,
-        stage="eval", cache=args.cache, shuffle=True
+        stage="eval", cache=args.cache, shuffle=True,
+        snapshot_dir=args.snapshot_dir,
+        precomputed_features=args.precomputed_features
     )
 else:
     train_dataset = ASRSliceDataset(
@@ -88,7 +113,7 @@ else:
         speech_featurizer=speech_featurizer,
         text_featurizer=text_featurizer,
         augmentations=config.learning_config.augmentations,
-        stage="train", cache=args.cache, shuffle=True
+        stage="train", cache=args.cache, shuffle=True, buckets=args.buckets
     )
     eval_dataset = ASRSliceDataset(
         data_paths=config.learning_config.dataset_config.eval_paths,
@@ -111,7 +136,15 @@ with streaming_transducer_trainer.strategy.scope():
     streaming_transducer._build(speech_featurizer.shape)
     streaming_transducer.summary(line_length=150)
 
-    optimizer = tf.keras.optimizers.get(config.learning_config.optimizer_config)
+    optimizer_config = copy.deepcopy(config.learning_config.optimizer_config)
+    if args.scale_lr:  # Global batch size is tbs * num_replicas_in_sync
+        learning_rate = optimizer_config["config"]["learning_rate"]
+        if not isinstance(learning_rate, (int, float)):
+            raise ValueError("--scale_lr only supports a constant learning_rate, "
+                             "scale the peak of a learning rate schedule in the config instead")
+        optimizer_config["config"]["learning_rate"] = learning_rate * strategy.num_replicas_in_sync
+    optimizer = tf.keras.optimizers.get(optimizer_config)
+    if args.mxp: optimizer = get_loss_scale_optimizer(optimizer)
 
 streaming_transducer_trainer.compile(model=streaming_transducer, optimizer=optimizer,
                                      max_to_keep=args.max_ckpts)
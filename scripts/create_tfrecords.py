@@ -14,7 +14,9 @@
 
 import argparse
 from tensorflow_asr.utils.utils import preprocess_paths
+from tensorflow_asr.configs.config import Config
 from tensorflow_asr.datasets.asr_dataset import ASRTFRecordDataset
+from tensorflow_asr.featurizers.speech_featurizers import TFSpeechFeaturizer
 
 modes = ["train", "eval", "test"]
 
@@ -26,6 +28,12 @@ parser.add_argument("--mode", "-m", type=str,
 parser.add_argument("--tfrecords_dir", type=str, default=None,
                     help="Directory to tfrecords")
 
+parser.add_argument("--features", default=False, action="store_true",
+                    help="Whether to store precomputed features (float16) instead of raw audio")
+
+parser.add_argument("--config", type=str, default=None,
+                    help="The file path of model configuration file, required for --features")
+
 parser.add_argument("transcripts", nargs="+", type=str,
                     default=None, help="Paths to transcript files")
 
@@ -36,9 +44,11 @@ assert args.mode in modes, f"Mode must in {modes}"
 transcripts = preprocess_paths(args.transcripts)
 tfrecords_dir = preprocess_paths(args.tfrecords_dir)
 
-if args.mode == "train":
-    ASRTFRecordDataset(transcripts, tfrecords_dir, None, None,
-                       args.mode, shuffle=True).create_tfrecords()
-else:
-    ASRTFRecordDataset(transcripts, tfrecords_dir, None, None,
-                       args.mode, shuffle=False).create_tfrecords()
+speech_featurizer = None
+if args.features:
+    assert args.config, "--config is required for --features"
+    speech_featurizer = TFSpeechFeaturizer(Config(args.config, learning=False).speech_config)
+
+ASRTFRecordDataset(transcripts, tfrecords_dir, speech_featurizer, None,
+                   args.mode, shuffle=(args.mode == "train"),
+                   precomputed_features=args.features).create_tfrecords()
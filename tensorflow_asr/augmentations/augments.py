@@ -36,6 +36,7 @@ AUGMENTATIONS = {
 class Augmentation:
     def __init__(self, config: dict = None):
         if not config: config = {}
+        self.config = config
         self.before = self.parse(config.get("before", {}))
         self.after = self.parse(config.get("after", {}))
 
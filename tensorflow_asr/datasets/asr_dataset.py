@@ -13,6 +13,7 @@
 # limitations under the License.
 import abc
 import glob
+import hashlib
 import multiprocessing
 import os
 
@@ -38,6 +39,15 @@ def to_tfrecord(path, audio, transcript):
     return tf.train.Example(features=tf.train.Features(feature=feature))
 
 
+def to_features_tfrecord(path, features, transcript):
+    feature = {
+        "path": bytestring_feature([path]),
+        "features": bytestring_feature([features]),
+        "transcript": bytestring_feature([transcript])
+    }
+    return tf.train.Example(features=tf.train.Features(feature=feature))
+
+
 def write_tfrecord_file(splitted_entries):
     shard_path, entries = splitted_entries
     with tf.io.TFRecordWriter(shard_path, options='ZLIB') as out:
@@ -58,10 +68,32 @@ class ASRDataset(BaseDataset):
                  data_paths: list,
                  augmentations: Augmentation = Augmentation(None),
                  cache: bool = False,
-                 shuffle: bool = False):
+                 shuffle: bool = False,
+                 buckets: list = None,
+                 snapshot_dir: str = None):
         super(ASRDataset, self).__init__(data_paths, augmentations, cache, shuffle, stage)
         self.speech_featurizer = speech_featurizer
         self.text_featurizer = text_featurizer
+        self.buckets = buckets  # bucket boundaries of audio durations in seconds
+        self.durations = None  # audio durations of entries, to count batches of buckets
+        self.snapshot_dir = snapshot_dir  # directory to snapshot WHOLE transformed dataset to disk
+
+    def get_snapshot_path(self):
+        """
+        Featurization and augmentation run inside tf.numpy_function, which the tf.data graph fingerprint
+        of a snapshot does not see, so the configs, the vocabulary and the entries are hashed into the snapshot path
+        """
+        key = hashlib.sha1()
+        key.update(type(self).__name__.encode("utf-8"))
+        key.update(repr(sorted(vars(self.speech_featurizer).items())).encode("utf-8"))
+        key.update(repr(sorted(vars(self.text_featurizer.decoder_config).items())).encode("utf-8"))
+        # decoder_config only holds the vocabulary path, hash the loaded tokens so editing the file counts
+        key.update(self.text_featurizer.upoints.numpy().tobytes())
+        key.update(repr(self.augmentations.config).encode("utf-8"))
+        for file_path in self.data_paths:
+            with tf.io.gfile.GFile(file_path, "r") as f:
+                key.update("\n".join(sorted(f.read().splitlines())).encode("utf-8"))
+        return os.path.join(self.snapshot_dir, f"{self.stage}_{key.hexdigest()}")
 
     def read_entries(self):
         lines = []
@@ -77,16 +109,23 @@ class ASRDataset(BaseDataset):
         if self.shuffle:
             np.random.shuffle(lines)  # Mix transcripts.tsv
         self.total_steps = len(lines)
+        self.durations = lines[:, 1].astype(np.float32) if len(lines) > 0 else np.zeros([0], np.float32)
         return lines
 
     def preprocess(self, audio, transcript):
+        features = self.preprocess_signal(audio)
+        return self.preprocess_features(features, transcript)
+
+    def preprocess_signal(self, audio):
         with tf.device("/CPU:0"):
             signal = read_raw_audio(audio, self.speech_featurizer.sample_rate)
 
             signal = self.augmentations.before.augment(signal)
 
-            features = self.speech_featurizer.extract(signal)
+            return self.speech_featurizer.extract(signal)
 
+    def preprocess_features(self, features, transcript):
+        with tf.device("/CPU:0"):
             features = self.augmentations.after.augment(features)
 
             label = self.text_featurizer.extract(transcript.decode("utf-8"))
@@ -100,31 +139,53 @@ class ASRDataset(BaseDataset):
     def process(self, dataset, batch_size):
         dataset = dataset.map(self.parse, num_parallel_calls=AUTOTUNE)
 
+        if self.snapshot_dir:
+            dataset = dataset.apply(tf.data.experimental.snapshot(self.get_snapshot_path(), compression="AUTO"))
+
         if self.cache:
             dataset = dataset.cache()
 
         if self.shuffle:
             dataset = dataset.shuffle(TFRECORD_SHARDS, reshuffle_each_iteration=True)
 
-        # PADDED BATCH the dataset
-        dataset = dataset.padded_batch(
-            batch_size=batch_size,
-            padded_shapes=(
-                tf.TensorShape([]),
-                tf.TensorShape(self.speech_featurizer.shape),
-                tf.TensorShape([]),
-                tf.TensorShape([None]),
-                tf.TensorShape([]),
-                tf.TensorShape([None])
-            ),
-            padding_values=("", 0., 0, self.text_featurizer.blank,
-                            0, self.text_featurizer.blank),
-            drop_remainder=True
+        padded_shapes = (
+            tf.TensorShape([]),
+            tf.TensorShape(self.speech_featurizer.shape),
+            tf.TensorShape([]),
+            tf.TensorShape([None]),
+            tf.TensorShape([]),
+            tf.TensorShape([None])
         )
+        padding_values = ("", 0., 0, self.text_featurizer.blank, 0, self.text_featurizer.blank)
+
+        if self.buckets:
+            # BUCKET BATCH the dataset by number of frames so each batch pads to similar lengths
+            boundaries = [int(duration * self.speech_featurizer.sample_rate / self.speech_featurizer.frame_step)
+                          for duration in self.buckets]
+            dataset = dataset.apply(tf.data.experimental.bucket_by_sequence_length(
+                element_length_func=lambda path, features, input_length, *_: input_length,
+                bucket_boundaries=boundaries,
+                bucket_batch_sizes=[batch_size] * (len(boundaries) + 1),
+                padded_shapes=padded_shapes,
+                padding_values=padding_values,
+                drop_remainder=True
+            ))
+            # drop_remainder applies to each bucket, so count full batches per bucket from the durations
+            # (an estimate when augmentations change durations, trainer corrects steps after the first epoch)
+            num_entries = np.bincount(np.digitize(self.durations, self.buckets), minlength=len(self.buckets) + 1)
+            self.total_steps = int(np.sum(num_entries // batch_size))
+        else:
+            # PADDED BATCH the dataset
+            dataset = dataset.padded_batch(
+                batch_size=batch_size,
+                padded_shapes=padded_shapes,
+                padding_values=padding_values,
+                drop_remainder=True
+            )
+            self.total_steps = get_num_batches(self.total_steps, batch_size)
 
         # PREFETCH to improve speed of input length
         dataset = dataset.prefetch(AUTOTUNE)
-        self.total_steps = get_num_batches(self.total_steps, batch_size)
         return dataset
 
     @abc.abstractmethod
@@ -151,11 +212,21 @@ class ASRTFRecordDataset(ASRDataset):
                  stage: str,
                  augmentations: Augmentation = Augmentation(None),
                  cache: bool = False,
-                 shuffle: bool = False):
+                 shuffle: bool = False,
+                 buckets: list = None,
+                 snapshot_dir: str = None,
+                 precomputed_features: bool = False):
         super(ASRTFRecordDataset, self).__init__(
             stage, speech_featurizer, text_featurizer,
-            data_paths, augmentations, cache, shuffle
+            data_paths, augmentations, cache, shuffle, buckets, snapshot_dir
         )
+        # Precomputed features are stored as float16 in a separate sub directory
+        self.precomputed_features = precomputed_features
+        if self.precomputed_features:
+            if self.augmentations.config.get("before"):
+                print(f"Signal augmentations cannot be applied on precomputed features, "
+                      f"ignoring 'before' augmentations of {self.stage} dataset")
+            tfrecords_dir = os.path.join(tfrecords_dir, "features")
         self.tfrecords_dir = tfrecords_dir
         if not os.path.exists(self.tfrecords_dir):
             os.makedirs(self.tfrecords_dir)
@@ -180,13 +251,34 @@ class ASRTFRecordDataset(ASRDataset):
         shards = [get_shard_path(idx) for idx in range(1, TFRECORD_SHARDS + 1)]
 
         splitted_entries = np.array_split(entries, TFRECORD_SHARDS)
-        with multiprocessing.Pool(TFRECORD_SHARDS) as pool:
-            pool.map(write_tfrecord_file, zip(shards, splitted_entries))
+        if self.precomputed_features:
+            # Feature extraction runs tensorflow ops, which are not fork-safe
+            for splitted in zip(shards, splitted_entries):
+                self.write_features_tfrecord_file(splitted)
+        else:
+            with multiprocessing.Pool(TFRECORD_SHARDS) as pool:
+                pool.map(write_tfrecord_file, zip(shards, splitted_entries))
 
         return True
 
+    def write_features_tfrecord_file(self, splitted_entries):
+        shard_path, entries = splitted_entries
+        with tf.io.TFRecordWriter(shard_path, options='ZLIB') as out:
+            for audio_file, _, transcript in entries:
+                signal = read_raw_audio(audio_file, self.speech_featurizer.sample_rate)
+                features = self.speech_featurizer.extract(signal)
+                features = tf.io.serialize_tensor(tf.convert_to_tensor(features, tf.float16))
+                example = to_features_tfrecord(bytes(audio_file, "utf-8"), features.numpy(),
+                                               bytes(transcript, "utf-8"))
+                out.write(example.SerializeToString())
+                print_one_line("Processed:", audio_file)
+        print(f"\nCreated {shard_path}")
+
     @tf.function
     def parse(self, record):
+        if self.precomputed_features:
+            return self.parse_features(record)
+
         feature_description = {
             "path": tf.io.FixedLenFeature([], tf.string),
             "audio": tf.io.FixedLenFeature([], tf.string),
@@ -201,6 +293,22 @@ class ASRTFRecordDataset(ASRDataset):
         )
         return example["path"], features, input_length, label, label_length, pred_inp
 
+    def parse_features(self, record):
+        feature_description = {
+            "path": tf.io.FixedLenFeature([], tf.string),
+            "features": tf.io.FixedLenFeature([], tf.string),
+            "transcript": tf.io.FixedLenFeature([], tf.string)
+        }
+        example = tf.io.parse_single_example(record, feature_description)
+        features = tf.cast(tf.io.parse_tensor(example["features"], out_type=tf.float16), tf.float32)
+
+        features, input_length, label, label_length, pred_inp = tf.numpy_function(
+            self.preprocess_features,
+            inp=[features, example["transcript"]],
+            Tout=(tf.float32, tf.int32, tf.int32, tf.int32, tf.int32)
+        )
+        return example["path"], features, input_length, label, label_length, pred_inp
+
     def create(self, batch_size):
         # Create TFRecords dataset
         have_data = self.create_tfrecords()
@@ -234,12 +342,21 @@ class ASRSliceDataset(ASRDataset):
         )
 
     def create(self, batch_size):
+        if self.shuffle and self.snapshot_dir:
+            # The shuffled entries are a constant of the dataset graph, so every run would write a new snapshot
+            raise ValueError("snapshot_dir requires shuffle=False for ASRSliceDataset, "
+                             "use ASRTFRecordDataset to snapshot a shuffled dataset")
         entries = self.read_entries()
         if len(entries) == 0:
             return None
         entries = np.delete(entries, 1, 1)  # Remove unused duration
 
         dataset = tf.data.Dataset.from_tensor_slices(entries)
+        if self.shuffle:
+            # Order does not matter when shuffling, so parallel map can yield elements as soon as they are ready
+            ignore_order = tf.data.Options()
+            ignore_order.experimental_deterministic = False
+            dataset = dataset.with_options(ignore_order)
 
         return self.process(dataset, batch_size)
 
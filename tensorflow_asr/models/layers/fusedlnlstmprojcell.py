@@ -0,0 +1,79 @@
+# Copyright 2020 Huy Le Nguyen (@usimarit)
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import tensorflow as tf
+
+
+# LSTM cell with LayerNorm and Dense projection applied on each step's output
+class FusedLNLSTMProjCell(tf.keras.layers.AbstractRNNCell):
+    def __init__(self,
+                 units: int,
+                 projection_units: int,
+                 layer_norm: bool = True,
+                 kernel_regularizer=None,
+                 bias_regularizer=None,
+                 name="fused_ln_lstm_proj_cell",
+                 **kwargs):
+        super(FusedLNLSTMProjCell, self).__init__(name=name, **kwargs)
+        kernel_regularizer = tf.keras.regularizers.get(kernel_regularizer)
+        bias_regularizer = tf.keras.regularizers.get(bias_regularizer)
+        self.lstm = tf.keras.layers.LSTMCell(
+            units, name=f"{name}_lstm",
+            kernel_regularizer=kernel_regularizer,
+            bias_regularizer=bias_regularizer
+        )
+        if layer_norm:
+            self.ln = tf.keras.layers.LayerNormalization(name=f"{name}_ln")
+        else:
+            self.ln = None
+        self.projection = tf.keras.layers.Dense(
+            projection_units, name=f"{name}_projection",
+            kernel_regularizer=kernel_regularizer,
+            bias_regularizer=bias_regularizer
+        )
+
+    @property
+    def state_size(self):
+        return self.lstm.state_size
+
+    @property
+    def output_size(self):
+        return self.projection.units
+
+    def build(self, input_shape):
+        self.lstm.build(input_shape)
+        if self.ln is not None:
+            self.ln.build([input_shape[0], self.lstm.units])
+        self.projection.build([input_shape[0], self.lstm.units])
+        self.built = True
+
+    def call(self, inputs, states, training=False):
+        outputs, new_states = self.lstm(inputs, states, training=training)
+        if self.ln is not None:
+            outputs = self.ln(outputs, training=training)
+        outputs = self.projection(outputs, training=training)
+        return outputs, new_states
+
+    def get_initial_state(self, inputs=None, batch_size=None, dtype=None):
+        return self.lstm.get_initial_state(inputs=inputs, batch_size=batch_size, dtype=dtype)
+
+    def get_config(self):
+        config = super(FusedLNLSTMProjCell, self).get_config()
+        config.update({
+            "units": self.lstm.units,
+            "projection_units": self.projection.units,
+            "layer_norm": self.ln is not None,
+            "kernel_regularizer": tf.keras.regularizers.serialize(self.lstm.kernel_regularizer),
+            "bias_regularizer": tf.keras.regularizers.serialize(self.lstm.bias_regularizer)
+        })
+        return config
@@ -16,6 +16,7 @@
 import tensorflow as tf
 
 from .layers.subsampling import TimeReduction
+from .layers.fusedlnlstmprojcell import FusedLNLSTMProjCell
 from .transducer import Transducer
 from ..utils.utils import get_rnn, merge_two_last_dims
 
@@ -31,6 +32,7 @@ class StreamingTransducerBlock(tf.keras.Model):
                  rnn_type: str = "lstm",
                  rnn_units: int = 2048,
                  layer_norm: bool = True,
+                 fused_cell: bool = False,
                  kernel_regularizer=None,
                  bias_regularizer=None,
                  **kwargs):
@@ -41,24 +43,46 @@ class StreamingTransducerBlock(tf.keras.Model):
         else:
             self.reduction = None
 
-        RNN = get_rnn(rnn_type)
-        self.rnn = RNN(
-            units=rnn_units, return_sequences=True,
-            name=f"{self.name}_rnn", return_state=True,
-            kernel_regularizer=kernel_regularizer,
-            bias_regularizer=bias_regularizer
-        )
-
-        if layer_norm:
-            self.ln = tf.keras.layers.LayerNormalization(name=f"{self.name}_ln")
-        else:
+        if fused_cell:
+            # LayerNorm and projection are computed inside the recurrence
+            assert rnn_type == "lstm", "fused_cell only supports lstm"
+            self.rnn = tf.keras.layers.RNN(
+                FusedLNLSTMProjCell(
+                    units=rnn_units, projection_units=dmodel,
+                    layer_norm=layer_norm,
+                    kernel_regularizer=kernel_regularizer,
+                    bias_regularizer=bias_regularizer,
+                    name=f"{self.name}_cell"
+                ),
+                return_sequences=True, return_state=True,
+                name=f"{self.name}_rnn"
+            )
             self.ln = None
+            self.projection = None
+        else:
+            # Keep arguments within the cuDNN kernel requirements explicitly
+            cudnn_kwargs = dict(activation="tanh", recurrent_dropout=0, use_bias=True,
+                                unroll=False, time_major=False)
+            if rnn_type != "rnn": cudnn_kwargs["recurrent_activation"] = "sigmoid"
+            RNN = get_rnn(rnn_type)
+            self.rnn = RNN(
+                units=rnn_units, return_sequences=True,
+                name=f"{self.name}_rnn", return_state=True,
+                kernel_regularizer=kernel_regularizer,
+                bias_regularizer=bias_regularizer,
+                **cudnn_kwargs
+            )
 
-        self.projection = tf.keras.layers.Dense(
-            dmodel, name=f"{self.name}_projection",
-            kernel_regularizer=kernel_regularizer,
-            bias_regularizer=bias_regularizer
-        )
+            if layer_norm:
+                self.ln = tf.keras.layers.LayerNormalization(name=f"{self.name}_ln")
+            else:
+                self.ln = None
+
+            self.projection = tf.keras.layers.Dense(
+                dmodel, name=f"{self.name}_projection",
+                kernel_regularizer=kernel_regularizer,
+                bias_regularizer=bias_regularizer
+            )
 
     def call(self, inputs, training=False):
         outputs = inputs
@@ -68,19 +92,32 @@ class StreamingTransducerBlock(tf.keras.Model):
         outputs = outputs[0]
         if self.ln is not None:
             outputs = self.ln(outputs, training=training)
-        outputs = self.projection(outputs, training=training)
+        if self.projection is not None:
+            outputs = self.projection(outputs, training=training)
         return outputs
 
     def recognize(self, inputs, states):
+        """Recognize function for encoder block
+
+        Args:
+            inputs (tf.Tensor): shape [1, T, D]
+            states (tf.Tensor): shape [1 or 2, 1, P]
+
+        Returns:
+            tf.Tensor: outputs with shape [1, T, E]
+            tf.Tensor: new states with shape [1 or 2, 1, P]
+        """
         outputs = inputs
         if self.reduction is not None:
             outputs = self.reduction(outputs)
-        outputs = self.rnn(outputs, training=False, initial_state=states)
+        outputs = self.rnn(outputs, training=False,
+                           initial_state=[states[i] for i in range(states.shape[0])])
         new_states = tf.stack(outputs[1:], axis=0)
         outputs = outputs[0]
         if self.ln is not None:
             outputs = self.ln(outputs, training=False)
-        outputs = self.projection(outputs, training=False)
+        if self.projection is not None:
+            outputs = self.projection(outputs, training=False)
         return outputs, new_states
 
     def get_config(self):
@@ -90,7 +127,8 @@ class StreamingTransducerBlock(tf.keras.Model):
         conf.update(self.rnn.get_config())
         if self.ln is not None:
             conf.update(self.ln.get_config())
-        conf.update(self.projection.get_config())
+        if self.projection is not None:
+            conf.update(self.projection.get_config())
         return conf
 
 
@@ -102,6 +140,7 @@ class StreamingTransducerEncoder(tf.keras.Model):
                  rnn_type: str = "lstm",
                  rnn_units: int = 2048,
                  layer_norm: bool = True,
+                 fused_cell: bool = False,
                  kernel_regularizer=None,
                  bias_regularizer=None,
                  **kwargs):
@@ -116,6 +155,7 @@ class StreamingTransducerEncoder(tf.keras.Model):
                 rnn_type=rnn_type,
                 rnn_units=rnn_units,
                 layer_norm=layer_norm,
+                fused_cell=fused_cell,
                 kernel_regularizer=kernel_regularizer,
                 bias_regularizer=bias_regularizer,
                 name=f"{self.name}_block_{i}"
@@ -133,16 +173,8 @@ class StreamingTransducerEncoder(tf.keras.Model):
         Returns:
             tf.Tensor: states having shape [num_rnns, 1 or 2, 1, P]
         """
-        states = []
-        for block in self.blocks:
-            states.append(
-                tf.stack(
-                    block.rnn.get_initial_state(
-                        tf.zeros([1, 1, 1], dtype=tf.float32)
-                    ), axis=0
-                )
-            )
-        return tf.stack(states, axis=0)
+        state_size = tf.nest.flatten(self.blocks[0].rnn.cell.state_size)
+        return tf.zeros([len(self.blocks), len(state_size), 1, state_size[0]], dtype=tf.float32)
 
     def call(self, inputs, training=False):
         outputs = self.reshape(inputs)
@@ -162,11 +194,16 @@ class StreamingTransducerEncoder(tf.keras.Model):
             tf.Tensor: new states with shape [num_lstms, 1 or 2, 1, P]
         """
         outputs = self.reshape(inputs)
-        new_states = []
+        new_states = tf.TensorArray(
+            dtype=states.dtype,
+            size=len(self.blocks),
+            dynamic_size=False,
+            element_shape=states.shape[1:]
+        )
         for i, block in enumerate(self.blocks):
-            outputs, block_states = block.recognize(outputs, states=tf.unstack(states[i], axis=0))
-            new_states.append(block_states)
-        return outputs, tf.stack(new_states, axis=0)
+            outputs, block_states = block.recognize(outputs, states=tf.gather(states, i, axis=0))
+            new_states = new_states.write(i, block_states)
+        return outputs, new_states.stack()
 
     def get_config(self):
         conf = self.reshape.get_config()
@@ -183,6 +220,7 @@ class StreamingTransducer(Transducer):
                  encoder_rnn_type: str = "lstm",
                  encoder_rnn_units: int = 2048,
                  encoder_layer_norm: bool = True,
+                 encoder_fused_cell: bool = False,
                  prediction_embed_dim: int = 320,
                  prediction_embed_dropout: float = 0,
                  prediction_num_rnns: int = 2,
@@ -203,6 +241,7 @@ class StreamingTransducer(Transducer):
                 rnn_type=encoder_rnn_type,
                 rnn_units=encoder_rnn_units,
                 layer_norm=encoder_layer_norm,
+                fused_cell=encoder_fused_cell,
                 kernel_regularizer=kernel_regularizer,
                 bias_regularizer=bias_regularizer,
                 name=f"{name}_encoder"
@@ -221,6 +260,7 @@ class StreamingTransducer(Transducer):
             name=name, **kwargs
         )
         self.time_reduction_factor = self.encoder.time_reduction_factor
+        self._streaming_function = None
 
     def summary(self, line_length=None, **kwargs):
         for block in self.encoder.blocks:
@@ -245,30 +285,6 @@ class StreamingTransducer(Transducer):
 
     # -------------------------------- GREEDY -------------------------------------
 
-    @tf.function
-    def recognize(self, signals):
-        """
-        RNN Transducer Greedy decoding
-        Args:
-            signals (tf.Tensor): a batch of padded signals
-
-        Returns:
-            tf.Tensor: a batch of decoded transcripts
-        """
-        def execute(signal: tf.Tensor):
-            features = self.speech_featurizer.tf_extract(signal)
-            encoded, _ = self.encoder_inference(features, self.encoder.get_initial_states())
-            hypothesis = self.perform_greedy(
-                encoded,
-                predicted=tf.constant(self.text_featurizer.blank, dtype=tf.int32),
-                states=self.predict_net.get_initial_state(),
-                swap_memory=True
-            )
-            transcripts = self.text_featurizer.iextract(tf.expand_dims(hypothesis.prediction, axis=0))
-            return tf.squeeze(transcripts)  # reshape from [1] to []
-
-        return tf.map_fn(execute, signals, fn_output_signature=tf.TensorSpec([], dtype=tf.string))
-
     def recognize_tflite(self, signal, predicted, encoder_states, prediction_states):
         """
         Function to convert to tflite using greedy decoding (default streaming mode)
@@ -308,12 +324,14 @@ class StreamingTransducer(Transducer):
         Returns:
             tf.Tensor: a batch of decoded transcripts
         """
+        encoder_states = self.encoder.get_initial_state()  # create zero states once for all signals
+
         def execute(signal: tf.Tensor):
             features = self.speech_featurizer.tf_extract(signal)
-            encoded, _ = self.encoder_inference(features, self.encoder.get_initial_states())
+            encoded, _ = self.encoder_inference(features, encoder_states)
             hypothesis = self.perform_beam_search(encoded, lm)
-            prediction = tf.map_fn(lambda x: tf.strings.to_number(x, tf.int32),
-                                   tf.strings.split(hypothesis.prediction), fn_output_signature=tf.TensorSpec([], dtype=tf.int32))
+            # split of a scalar string is a 1-D tensor, which to_number converts at once
+            prediction = tf.strings.to_number(tf.strings.split(hypothesis.prediction), out_type=tf.int32)
             transcripts = self.text_featurizer.iextract(tf.expand_dims(prediction, axis=0))
             return tf.squeeze(transcripts)  # reshape from [1] to []
 
@@ -322,14 +340,17 @@ class StreamingTransducer(Transducer):
     # -------------------------------- TFLITE -------------------------------------
 
     def make_tflite_function(self, greedy: bool = True):
-        return tf.function(
-            self.recognize_tflite,
-            input_signature=[
-                tf.TensorSpec([None], dtype=tf.float32),
-                tf.TensorSpec([], dtype=tf.int32),
-                tf.TensorSpec(self.encoder.get_initial_state().get_shape(),
-                              dtype=tf.float32),
-                tf.TensorSpec(self.predict_net.get_initial_state().get_shape(),
-                              dtype=tf.float32)
-            ]
-        )
+        # Trace once so that every streaming chunk reuses the same concrete function
+        if self._streaming_function is None:
+            self._streaming_function = tf.function(
+                self.recognize_tflite,
+                input_signature=[
+                    tf.TensorSpec([None], dtype=tf.float32),
+                    tf.TensorSpec([], dtype=tf.int32),
+                    tf.TensorSpec(self.encoder.get_initial_state().get_shape(),
+                                  dtype=tf.float32),
+                    tf.TensorSpec(self.predict_net.get_initial_state().get_shape(),
+                                  dtype=tf.float32)
+                ]
+            )
+        return self._streaming_function
@@ -164,10 +164,12 @@ class TransducerJoint(tf.keras.Model):
             joint_dim, use_bias=False, name=f"{name}_pred",
             kernel_regularizer=kernel_regularizer
         )
+        # Keep logits in float32 for numerical stability under mixed precision
         self.ffn_out = tf.keras.layers.Dense(
             vocabulary_size, name=f"{name}_vocab",
             kernel_regularizer=kernel_regularizer,
-            bias_regularizer=bias_regularizer
+            bias_regularizer=bias_regularizer,
+            dtype="float32"
         )
 
     def call(self, inputs, training=False):
@@ -300,12 +302,38 @@ class Transducer(Model):
             (ytu, new_states)
         """
         with tf.name_scope(f"{self.name}_decoder"):
-            encoded = tf.reshape(encoded, [1, 1, -1])  # [E] => [1, 1, E]
+            y, new_states = self.prediction_inference(predicted, states)  # [1, 1, P], states
+            ytu = self.joint_inference(encoded, y)  # [V]
+            return ytu, new_states
+
+    def prediction_inference(self, predicted, states):
+        """Infer function for prediction network
+
+        Args:
+            predicted (tf.Tensor): last character index of predicted sequence => shape []
+            states (nested lists of tf.Tensor): states returned by rnn layers
+
+        Returns:
+            (y, new_states) where y has shape [1, 1, P]
+        """
+        with tf.name_scope(f"{self.name}_prediction"):
             predicted = tf.reshape(predicted, [1, 1])  # [] => [1, 1]
-            y, new_states = self.predict_net.recognize(predicted, states)  # [1, 1, P], states
+            return self.predict_net.recognize(predicted, states)
+
+    def joint_inference(self, encoded, y):
+        """Infer function for joint network
+
+        Args:
+            encoded (tf.Tensor): output of encoder at each time step => shape [E]
+            y (tf.Tensor): output of prediction network => shape [1, 1, P]
+
+        Returns:
+            tf.Tensor: log probabilities with shape [V]
+        """
+        with tf.name_scope(f"{self.name}_joint"):
+            encoded = tf.reshape(encoded, [1, 1, -1])  # [E] => [1, 1, E]
             ytu = tf.nn.log_softmax(self.joint_net([encoded, y], training=False))  # [1, 1, V]
-            ytu = tf.squeeze(ytu, axis=None)  # [1, 1, V] => [V]
-            return ytu, new_states
+            return tf.squeeze(ytu, axis=None)  # [1, 1, V] => [V]
 
     def get_config(self):
         conf = self.encoder.get_config()
@@ -325,19 +353,10 @@ class Transducer(Model):
         Returns:
             tf.Tensor: a batch of decoded transcripts
         """
-        def execute(signal: tf.Tensor):
-            features = self.speech_featurizer.tf_extract(signal)
-            encoded = self.encoder_inference(features)
-            hypothesis = self.perform_greedy(
-                encoded,
-                predicted=tf.constant(self.text_featurizer.blank, dtype=tf.int32),
-                states=self.predict_net.get_initial_state(),
-                swap_memory=True
-            )
-            transcripts = self.text_featurizer.iextract(tf.expand_dims(hypothesis.prediction, axis=0))
-            return tf.squeeze(transcripts)  # reshape from [1] to []
-
-        return tf.map_fn(execute, signals, fn_output_signature=tf.TensorSpec([], dtype=tf.string))
+        features = tf.vectorized_map(self.speech_featurizer.tf_extract, signals)
+        encoded = self.encoder(features, training=False)
+        prediction = self.perform_greedy_batch(encoded, swap_memory=True)
+        return self.text_featurizer.iextract(prediction)
 
     def recognize_tflite(self, signal, predicted, states):
         """
@@ -382,29 +401,34 @@ class Transducer(Model):
                 states=states
             )
 
-            def condition(time, total, encoded, hypothesis): return tf.less(time, total)
+            # The prediction network only depends on the last predicted character and its states,
+            # so its output is cached and only recomputed when a non-blank character is emitted
+            y, y_states = self.prediction_inference(predicted, states)
+
+            def condition(time, total, encoded, hypothesis, y, y_states): return tf.less(time, total)
 
-            def body(time, total, encoded, hypothesis):
-                ytu, new_states = self.decoder_inference(
+            def body(time, total, encoded, hypothesis, y, y_states):
+                ytu = self.joint_inference(
                     # avoid using [index] in tflite
                     encoded=tf.gather_nd(encoded, tf.expand_dims(time, axis=-1)),
-                    predicted=hypothesis.prediction.read(hypothesis.index),
-                    states=hypothesis.states
+                    y=y
                 )
                 char = tf.argmax(ytu, axis=-1, output_type=tf.int32)  # => argmax []
 
-                index, char, new_states = tf.cond(
+                def non_blank():
+                    new_y, new_y_states = self.prediction_inference(char, y_states)
+                    return hypothesis.index + 1, char, y_states, new_y, new_y_states
+
+                index, char, new_states, y, y_states = tf.cond(
                     tf.equal(char, self.text_featurizer.blank),
                     true_fn=lambda: (
                         hypothesis.index,
                         hypothesis.prediction.read(hypothesis.index),
-                        hypothesis.states
+                        hypothesis.states,
+                        y,
+                        y_states
                     ),
-                    false_fn=lambda: (
-                        hypothesis.index + 1,
-                        char,
-                        new_states
-                    )
+                    false_fn=non_blank
                 )
 
                 hypothesis = Hypothesis(
@@ -413,12 +437,12 @@ class Transducer(Model):
                     states=new_states
                 )
 
-                return time + 1, total, encoded, hypothesis
+                return time + 1, total, encoded, hypothesis, y, y_states
 
-            time, total, encoded, hypothesis = tf.while_loop(
+            time, total, encoded, hypothesis, _, _ = tf.while_loop(
                 condition,
                 body,
-                loop_vars=(time, total, encoded, hypothesis),
+                loop_vars=(time, total, encoded, hypothesis, y, y_states),
                 swap_memory=swap_memory
             )
 
@@ -434,6 +458,76 @@ class Transducer(Model):
 
             return hypothesis
 
+    def perform_greedy_batch(self, encoded, swap_memory=False):
+        """Greedy decoding a whole batch in lockstep
+
+        Args:
+            encoded (tf.Tensor): output of encoders with shape [B, T, E]
+            swap_memory (bool, optional): swap memory of while loop. Defaults to False.
+
+        Returns:
+            tf.Tensor: predicted sequences with a leading blank, padded with blanks, shape [B, T + 1]
+        """
+        with tf.name_scope(f"{self.name}_greedy_batch"):
+            batch_size, total = shape_list(encoded)[:2]
+            blank = self.text_featurizer.blank
+
+            time = tf.constant(0, dtype=tf.int32)
+            predicted = tf.fill([batch_size], blank)  # [B]
+            states = tf.tile(self.predict_net.get_initial_state(), [1, 1, batch_size, 1])
+            y, states = self.predict_net.recognize(tf.expand_dims(predicted, axis=-1), states)
+
+            prediction = tf.TensorArray(
+                dtype=tf.int32,
+                size=total,
+                dynamic_size=False,
+                element_shape=tf.TensorShape([None]),
+                clear_after_read=False
+            )
+
+            def condition(time, total, encoded, prediction, predicted, y, states): return tf.less(time, total)
+
+            def body(time, total, encoded, prediction, predicted, y, states):
+                encoded_t = tf.expand_dims(tf.gather(encoded, time, axis=1), axis=1)  # [B, 1, E]
+                ytu = self.joint_net([encoded_t, y], training=False)  # [B, 1, 1, V]
+                char = tf.argmax(tf.squeeze(ytu, axis=[1, 2]), axis=-1, output_type=tf.int32)  # [B]
+                emitted = tf.not_equal(char, blank)
+
+                def update():
+                    # Only utterances that emitted a non-blank character advance their prediction network
+                    new_y, new_states = self.predict_net.recognize(
+                        tf.expand_dims(tf.where(emitted, char, predicted), axis=-1), states)
+                    return (
+                        tf.where(emitted, char, predicted),
+                        tf.where(tf.reshape(emitted, [-1, 1, 1]), new_y, y),
+                        tf.where(tf.reshape(emitted, [1, 1, -1, 1]), new_states, states)
+                    )
+
+                predicted, y, states = tf.cond(
+                    tf.reduce_any(emitted),
+                    true_fn=update,
+                    false_fn=lambda: (predicted, y, states)
+                )
+
+                return time + 1, total, encoded, prediction.write(time, char), predicted, y, states
+
+            _, _, _, prediction, _, _, _ = tf.while_loop(
+                condition,
+                body,
+                loop_vars=(time, total, encoded, prediction, predicted, y, states),
+                swap_memory=swap_memory
+            )
+
+            # [T, B] => [B, T], then move blanks to the end of each sequence (keeping the order of characters)
+            # so each row reads like the per-utterance hypothesis: only CharFeaturizer drops blanks anywhere
+            # (its blank token is ""), while SubwordFeaturizer strips only the leading blank and the subword
+            # decoder only trailing paddings, so blanks between subwords would be decoded as wrong subwords
+            prediction = tf.transpose(prediction.stack(), perm=[1, 0])
+            order = tf.argsort(tf.cast(tf.equal(prediction, blank), tf.int32), axis=-1, stable=True)
+            prediction = tf.gather(prediction, order, axis=-1, batch_dims=1)
+
+            return tf.concat([tf.fill([batch_size, 1], blank), prediction], axis=-1)
+
     # -------------------------------- BEAM SEARCH -------------------------------------
 
     @tf.function
@@ -451,8 +545,8 @@ class Transducer(Model):
             features = self.speech_featurizer.tf_extract(signal)
             encoded = self.encoder_inference(features)
             hypothesis = self.perform_beam_search(encoded, lm)
-            prediction = tf.map_fn(lambda x: tf.strings.to_number(x, tf.int32),
-                                   tf.strings.split(hypothesis.prediction), fn_output_signature=tf.TensorSpec([], dtype=tf.int32))
+            # split of a scalar string is a 1-D tensor, which to_number converts at once
+            prediction = tf.strings.to_number(tf.strings.split(hypothesis.prediction), out_type=tf.int32)
             transcripts = self.text_featurizer.iextract(tf.expand_dims(prediction, axis=0))
             return tf.squeeze(transcripts)  # reshape from [1] to []
 
@@ -21,6 +21,7 @@ from .base_runners import BaseTrainer
 from ..losses.rnnt_losses import rnnt_loss
 from ..models.transducer import Transducer
 from ..featurizers.text_featurizers import TextFeaturizer
+from ..utils.utils import is_loss_scale_optimizer
 
 
 class TransducerTrainer(BaseTrainer):
@@ -58,8 +59,12 @@ class TransducerTrainer(BaseTrainer):
             )
             train_loss = tf.nn.compute_average_loss(per_train_loss,
                                                     global_batch_size=self.global_batch_size)
+            if self.mixed_precision:
+                train_loss = self.optimizer.get_scaled_loss(train_loss)
 
         gradients = tape.gradient(train_loss, self.model.trainable_variables)
+        if self.mixed_precision:
+            gradients = self.optimizer.get_unscaled_gradients(gradients)
         self.optimizer.apply_gradients(zip(gradients, self.model.trainable_variables))
 
         self.train_metrics["transducer_loss"].update_state(per_train_loss)
@@ -84,6 +89,7 @@ class TransducerTrainer(BaseTrainer):
         with self.strategy.scope():
             self.model = model
             self.optimizer = tf.keras.optimizers.get(optimizer)
+            self.mixed_precision = is_loss_scale_optimizer(self.optimizer)
         self.create_checkpoint_manager(max_to_keep, model=self.model, optimizer=self.optimizer)
 
 
@@ -119,8 +125,12 @@ class TransducerTrainerGA(TransducerTrainer):
                 per_train_loss,
                 global_batch_size=self.global_batch_size
             )
+            if self.mixed_precision:
+                train_loss = self.optimizer.get_scaled_loss(train_loss)
 
         gradients = tape.gradient(train_loss, self.model.trainable_variables)
+        if self.mixed_precision:
+            gradients = self.optimizer.get_unscaled_gradients(gradients)
         self.accumulation.accumulate(gradients)
         self.train_metrics["transducer_loss"].update_state(per_train_loss)
 
@@ -131,5 +141,6 @@ class TransducerTrainerGA(TransducerTrainer):
         with self.strategy.scope():
             self.model = model
             self.optimizer = tf.keras.optimizers.get(optimizer)
+            self.mixed_precision = is_loss_scale_optimizer(self.optimizer)
         self.create_checkpoint_manager(max_to_keep, model=self.model, optimizer=self.optimizer)
         self.accumulation = GradientAccumulation(self.model.trainable_variables)
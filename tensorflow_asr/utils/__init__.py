@@ -60,6 +60,10 @@ def setup_strategy(devices):
 
     setup_devices(devices)
 
+    if len(tf.config.list_logical_devices("GPU")) > 1:
+        # Use NCCL for fused all-reduce of gradients across gpus
+        return tf.distribute.MirroredStrategy(cross_device_ops=tf.distribute.NcclAllReduce())
+
     return tf.distribute.MirroredStrategy()
 
 
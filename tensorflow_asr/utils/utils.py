@@ -79,6 +79,26 @@ def get_rnn(rnn_type: str):
     return tf.keras.layers.SimpleRNN
 
 
+def set_mixed_precision_policy(policy: str):
+    """ Set keras global policy, mixed precision api is experimental before tf 2.4 """
+    if hasattr(tf.keras.mixed_precision, "set_global_policy"):
+        tf.keras.mixed_precision.set_global_policy(policy)
+    else:
+        tf.keras.mixed_precision.experimental.set_policy(policy)
+
+
+def get_loss_scale_optimizer(optimizer):
+    if hasattr(tf.keras.mixed_precision, "LossScaleOptimizer"):
+        return tf.keras.mixed_precision.LossScaleOptimizer(optimizer)
+    return tf.keras.mixed_precision.experimental.LossScaleOptimizer(optimizer, loss_scale="dynamic")
+
+
+def is_loss_scale_optimizer(optimizer) -> bool:
+    if hasattr(tf.keras.mixed_precision, "LossScaleOptimizer"):
+        return isinstance(optimizer, tf.keras.mixed_precision.LossScaleOptimizer)
+    return isinstance(optimizer, tf.keras.mixed_precision.experimental.LossScaleOptimizer)
+
+
 def get_conv(conv_type):
     assert conv_type in ["conv1d", "conv2d"]
 
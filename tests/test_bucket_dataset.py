@@ -0,0 +1,73 @@
+# Copyright 2020 Huy Le Nguyen (@usimarit)
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import os
+import tempfile
+import numpy as np
+import soundfile as sf
+
+from tensorflow_asr.utils import setup_environment
+setup_environment()
+from tensorflow_asr.datasets.asr_dataset import ASRSliceDataset
+from tensorflow_asr.featurizers.speech_featurizers import TFSpeechFeaturizer
+from tensorflow_asr.featurizers.text_featurizers import CharFeaturizer
+
+text_featurizer = CharFeaturizer({
+    "vocabulary": None,
+    "blank_at_zero": True,
+    "beam_width": 5,
+    "norm_score": True
+})
+
+speech_featurizer = TFSpeechFeaturizer({
+    "sample_rate": 16000,
+    "frame_ms": 25,
+    "stride_ms": 10,
+    "num_feature_bins": 80,
+    "feature_type": "log_mel_spectrogram",
+    "preemphasis": 0.97,
+    "normalize_signal": True,
+    "normalize_feature": True,
+    "normalize_per_feature": False
+})
+
+buckets = [1, 2]
+durations = [0.5] * 5 + [1.5] * 4 + [2.5] * 3
+
+data_dir = tempfile.mkdtemp()
+data = os.path.join(data_dir, "transcripts.tsv")
+with open(data, "w", encoding="utf-8") as f:
+    f.write("PATH\tDURATION\tTRANSCRIPT\n")
+    for i, duration in enumerate(durations):
+        path = os.path.join(data_dir, f"{i}.wav")
+        sf.write(path, np.random.uniform(-0.5, 0.5, int(duration * 16000)).astype(np.float32), 16000)
+        f.write(f"{path}\t{duration}\thello world\n")
+
+asr_dataset = ASRSliceDataset(stage="train", speech_featurizer=speech_featurizer,
+                              text_featurizer=text_featurizer, data_paths=[data],
+                              shuffle=True, buckets=buckets)
+dataset = asr_dataset.create(2)
+
+boundaries = [int(duration * speech_featurizer.sample_rate / speech_featurizer.frame_step) for duration in buckets]
+
+num_batches = 0
+for path, features, input_length, label, label_length, pred_inp in dataset:
+    # every utterance of a batch must fall in the same bucket of input lengths
+    bucket_ids = np.digitize(input_length.numpy(), boundaries)
+    assert np.all(bucket_ids == bucket_ids[0]), input_length.numpy()
+    num_batches += 1
+
+# remainders are dropped per bucket: 5 // 2 + 4 // 2 + 3 // 2
+assert num_batches == asr_dataset.total_steps == 5, (num_batches, asr_dataset.total_steps)
+print("Bucketed batches:", num_batches)
@@ -19,6 +19,7 @@ os.environ["TF_CPP_MIN_LOG_LEVEL"] = "0"
 import tensorflow as tf
 
 from tensorflow_asr.models.streaming_transducer import StreamingTransducer
+from tensorflow_asr.models.layers.fusedlnlstmprojcell import FusedLNLSTMProjCell
 from tensorflow_asr.featurizers.text_featurizers import CharFeaturizer
 from tensorflow_asr.featurizers.speech_featurizers import TFSpeechFeaturizer, read_raw_audio
 
@@ -54,12 +55,41 @@ model.add_featurizers(
     text_featurizer=text_featurizer
 )
 
-features = tf.zeros(shape=[5, 50, 80, 1], dtype=tf.float32)
-pred = model.recognize(features)
+signals = tf.random.normal(shape=[3, 16000], dtype=tf.float32)
+pred = model.recognize(signals)
 print(pred)
-pred = model.recognize_beam(features)
+
+# batched greedy decoding must give the same transcripts as decoding each utterance alone
+for i in range(signals.shape[0]):
+    features = speech_featurizer.tf_extract(signals[i])
+    encoded, _ = model.encoder_inference(features, model.encoder.get_initial_state())
+    hypothesis = model.perform_greedy(
+        encoded,
+        predicted=tf.constant(text_featurizer.blank, dtype=tf.int32),
+        states=model.predict_net.get_initial_state()
+    )
+    transcript = text_featurizer.iextract(tf.expand_dims(hypothesis.prediction, axis=0))
+    assert transcript[0].numpy() == pred[i].numpy(), f"{transcript[0].numpy()} != {pred[i].numpy()}"
+
+pred = model.recognize_beam(signals)
 print(pred)
 
+# encoder blocks with the fused LayerNorm-LSTM-projection cell
+fused_model = StreamingTransducer(vocabulary_size=text_featurizer.num_classes,
+                                  encoder_dmodel=320, encoder_nlayers=3, encoder_fused_cell=True,
+                                  kernel_regularizer=tf.keras.regularizers.l2(1e-6),
+                                  bias_regularizer=tf.keras.regularizers.l2(1e-6))
+fused_model._build(speech_featurizer.shape)
+encoded, encoder_states = fused_model.encoder_inference(speech_featurizer.tf_extract(signals[0]),
+                                                        fused_model.encoder.get_initial_state())
+print(encoded.shape, encoder_states.shape)
+
+cell = fused_model.encoder.blocks[0].rnn.cell
+restored_cell = FusedLNLSTMProjCell.from_config(cell.get_config())
+assert restored_cell.get_config() == cell.get_config(), restored_cell.get_config()
+assert restored_cell.lstm.kernel_regularizer.get_config() == cell.lstm.kernel_regularizer.get_config()
+assert restored_cell.lstm.bias_regularizer.get_config() == cell.lstm.bias_regularizer.get_config()
+
 # stamp = datetime.datetime.now().strftime("%Y%m%d-%H%M%S")
 # logdir = '/tmp/logs/func/%s' % stamp
 # writer = tf.summary.create_file_writer(logdir)